@@ -6,8 +6,15 @@ Modelos disponíveis:
 2. Safety Equipment Detection
 
 Execute: python download_epi_model.py
+
+Quantização INT8 para execução em CPU (requer onnx e onnxruntime):
+    python download_epi_model.py quantize --frames pasta_com_frames
 """
 
+import argparse
+import glob
+import random
+import re
 import urllib.request
 import os
 import sys
@@ -22,6 +29,15 @@ MODELS = {
     }
 }
 
+# Modelo de EPI usado pelo detector
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "model_EPI.pt")
+
+# Tamanho de entrada do modelo (igual a EPIDetector.INPUT_SIZE)
+INPUT_SIZE = 640
+
+# Diferença relativa máxima no total de detecções (INT8 x FP32) para aceitar o modelo
+MAX_DETECTION_DRIFT = 0.2
+
 
 def download_file(url: str, destination: str):
     """Baixa arquivo da URL."""
@@ -139,6 +155,152 @@ yolo train data=path/to/data.yaml model=yolov8n.pt epochs=100 imgsz=640
         print("Ok! Siga as instruções acima para obter um modelo de EPI.")
 
 
+def load_calibration_frame(path: str):
+    """Carrega uma imagem no formato de entrada do modelo (letterbox, RGB, NCHW, 0-1)."""
+    import cv2
+    import numpy as np
+    
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    
+    # Letterbox para INPUT_SIZE x INPUT_SIZE com bordas cinza (114), como no detector
+    height, width = image.shape[:2]
+    gain = min(INPUT_SIZE / width, INPUT_SIZE / height)
+    resized_w, resized_h = round(width * gain), round(height * gain)
+    pad_x, pad_y = (INPUT_SIZE - resized_w) // 2, (INPUT_SIZE - resized_h) // 2
+    
+    canvas = np.full((INPUT_SIZE, INPUT_SIZE, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w] = cv2.resize(image, (resized_w, resized_h))
+    
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1)[np.newaxis]
+    return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0
+
+
+def find_head_nodes(graph) -> list:
+    """
+    Retorna os nós da cabeça de detecção (último módulo, ex.: `/model.22/`).
+    
+    A cabeça concatena coordenadas das caixas (0-640) e scores das classes
+    (0-1) no mesmo tensor; com uma única escala UINT8 os scores viram zero,
+    então ela é mantida em FP32.
+    """
+    module_ids = [
+        int(match.group(1))
+        for match in (re.match(r"/model\.(\d+)/", node.name) for node in graph.node)
+        if match
+    ]
+    if not module_ids:
+        return []
+    head_prefix = f"/model.{max(module_ids)}/"
+    return [node.name for node in graph.node if node.name.startswith(head_prefix)]
+
+
+def count_detections(model_path: str, frame_paths: list) -> int:
+    """Total de detecções (conf >= 0.5) do modelo nos frames de calibração."""
+    from ultralytics import YOLO
+    
+    model = YOLO(model_path, task="detect")
+    results = model.predict(frame_paths, conf=0.5, imgsz=INPUT_SIZE, verbose=False, stream=True)
+    return sum(len(result.boxes) for result in results)
+
+
+def quantize_model(model_path: str, frames_dir: str, num_frames: int = 100):
+    """
+    Gera `<modelo>_int8.onnx`: exporta o modelo para ONNX e aplica quantização
+    estática INT8 calibrada com frames reais das câmeras.
+    
+    A cabeça de detecção fica em FP32 e o modelo só é salvo se o total de
+    detecções nos frames de calibração ficar próximo ao do modelo FP32.
+    
+    Args:
+        model_path: Caminho para o modelo PyTorch (.pt)
+        frames_dir: Pasta com frames de exemplo (.jpg/.png) das câmeras
+        num_frames: Número máximo de frames usados na calibração
+    """
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from ultralytics import YOLO
+    
+    frame_paths = [
+        path
+        for pattern in ("*.jpg", "*.jpeg", "*.png")
+        for path in glob.glob(os.path.join(frames_dir, pattern))
+    ]
+    if not frame_paths:
+        print(f"❌ Nenhum frame encontrado em: {frames_dir}")
+        return False
+    frame_paths = random.sample(frame_paths, min(num_frames, len(frame_paths)))
+    
+    # Exportar em FP32 (lote dinâmico, para aceitar os lotes do scheduler)
+    print(f"⚙️ Exportando {model_path} para ONNX...")
+    fp32_path = YOLO(model_path).export(format="onnx", imgsz=INPUT_SIZE, dynamic=True, simplify=True)
+    fp32_model = onnx.load(fp32_path)
+    input_name = fp32_model.graph.input[0].name
+    
+    class FrameCalibrationReader(CalibrationDataReader):
+        """Fornece os frames de calibração, um por vez, ao quantizador."""
+        
+        def __init__(self):
+            self._frames = iter(frame_paths)
+        
+        def get_next(self):
+            for path in self._frames:
+                tensor = load_calibration_frame(path)
+                if tensor is not None:
+                    return {input_name: tensor}
+            return None
+    
+    head_nodes = find_head_nodes(fp32_model.graph)
+    
+    int8_path = f"{os.path.splitext(model_path)[0]}_int8.onnx"
+    candidate_path = f"{os.path.splitext(model_path)[0]}_int8_candidate.onnx"
+    print(f"⚙️ Quantizando para INT8 com {len(frame_paths)} frames de calibração "
+          f"({len(head_nodes)} nós da cabeça mantidos em FP32)...")
+    quantize_static(
+        fp32_path,
+        candidate_path,
+        calibration_data_reader=FrameCalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        nodes_to_exclude=head_nodes
+    )
+    
+    # Copiar os metadados do ultralytics (classes, stride, imgsz) para o modelo INT8
+    int8_model = onnx.load(candidate_path)
+    onnx.helper.set_model_props(int8_model, {prop.key: prop.value for prop in fp32_model.metadata_props})
+    onnx.save(int8_model, candidate_path)
+    
+    # Validar: o detector usa o modelo INT8 automaticamente em CPU
+    print("🔍 Comparando detecções FP32 x INT8 nos frames de calibração...")
+    fp32_count = count_detections(fp32_path, frame_paths)
+    int8_count = count_detections(candidate_path, frame_paths)
+    print(f"   FP32: {fp32_count} detecções | INT8: {int8_count} detecções")
+    
+    if abs(int8_count - fp32_count) > MAX_DETECTION_DRIFT * max(fp32_count, 1):
+        os.remove(candidate_path)
+        print(f"❌ Modelo INT8 descartado: diferença acima de {MAX_DETECTION_DRIFT:.0%} em relação ao FP32")
+        return False
+    
+    os.replace(candidate_path, int8_path)
+    print(f"✅ Modelo INT8 salvo em: {int8_path}")
+    print("   Em CPU, o detector passa a usá-lo automaticamente.")
+    return True
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ferramentas do modelo de detecção de EPIs")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    quantize_parser = subparsers.add_parser("quantize", help="Quantiza o modelo para INT8 (execução em CPU)")
+    quantize_parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="Modelo PyTorch (.pt)")
+    quantize_parser.add_argument("--frames", required=True, help="Pasta com frames de exemplo para calibração")
+    quantize_parser.add_argument("--num-frames", type=int, default=100, help="Número máximo de frames de calibração")
+    
+    args = parser.parse_args()
+    if args.command == "quantize":
+        sys.exit(0 if quantize_model(args.model, args.frames, args.num_frames) else 1)
     main()
 
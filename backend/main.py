@@ -1,7 +1,21 @@
+import importlib.util
+import os
+
+import cv2
+
+# Limitar o OpenCV a uma thread antes de importar o detector: o paralelismo
+# fica com o pipeline de streams, evitando criar núcleos x streams threads
+cv2.setNumThreads(1)
+cv2.ocl.setUseOpenCL(False)
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import uvicorn
 
+from models.detector import get_detector, is_detector_ready
+from models.scheduler import get_scheduler
 from routers import cameras, stream
 
 # Criar aplicação FastAPI
@@ -25,6 +39,29 @@ app.include_router(cameras.router)
 app.include_router(stream.router)
 
 
+@app.on_event("startup")
+async def load_detector():
+    """
+    Carrega e aquece o detector antes de aceitar requisições, para que o
+    primeiro stream não espere pelo modelo. Se o modelo não carregar, a
+    aplicação não sobe.
+    """
+    await run_in_threadpool(get_detector)
+
+
+@app.on_event("startup")
+async def start_scheduler():
+    """Inicia o worker de inferência em lote."""
+    print(f"🧵 Threads do OpenCV: {cv2.getNumThreads()}")
+    await get_scheduler().start()
+
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    """Encerra o worker de inferência em lote."""
+    await get_scheduler().stop()
+
+
 @app.get("/")
 async def root():
     """Endpoint raiz da API."""
@@ -37,15 +74,33 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Verifica se a API está funcionando."""
+    """Verifica se a API está funcionando e o detector está pronto."""
+    if not is_detector_ready():
+        return JSONResponse(status_code=503, content={"status": "warming"})
     return {"status": "healthy"}
 
 
 if __name__ == "__main__":
+    # uvloop e httptools (instalados com uvicorn[standard]) quando disponíveis;
+    # no Windows o uvloop não existe e o asyncio padrão é usado
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
+    # Câmeras, pipelines e modelo ficam em memória no processo: com mais de um
+    # worker cada um teria seu próprio estado, por isso o padrão é 1
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    reload = os.environ.get("EPI_RELOAD", "0") == "1"
+    if workers > 1:
+        print(f"⚠️ {workers} workers: cada um mantém suas próprias câmeras e modelo em memória")
+    
+    print(f"🌐 Servidor: loop={loop}, http={http}, workers={workers}, reload={reload}")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=reload,
+        workers=1 if reload else workers,
+        loop=loop,
+        http=http
     )
 
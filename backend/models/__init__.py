@@ -1,2 +1,2 @@
-from .detector import EPIDetector, get_detector
-
+from .detector import Detections, EPIDetector, get_detector, is_detector_ready
+from .scheduler import InferenceScheduler, get_scheduler
@@ -1,9 +1,26 @@
 import cv2
 import numpy as np
+import torch
 from ultralytics import YOLO
-from typing import Tuple, List, Dict
-import threading
+from typing import Tuple, List, Dict, NamedTuple
+import importlib.util
 import os
+import shutil
+
+
+class Detections(NamedTuple):
+    """Detecções de um frame em arrays paralelos (um elemento por caixa)."""
+    cls_ids: np.ndarray  # int32 (N,)
+    confs: np.ndarray    # float32 (N,)
+    xyxy: np.ndarray     # int32 (N, 4), em coordenadas do frame de exibição
+    
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(
+            cls_ids=np.empty(0, dtype=np.int32),
+            confs=np.empty(0, dtype=np.float32),
+            xyxy=np.empty((0, 4), dtype=np.int32)
+        )
 
 
 class EPIDetector:
@@ -38,14 +55,30 @@ class EPIDetector:
         10: {"name": "Sem Botas", "color": (0, 0, 160), "is_epi": False, "is_violation": True},
     }
     
-    def __init__(self, model_path: str = None):
+    # Tabelas indexadas pelo ID da classe (CLASS_CONFIG tem IDs contíguos 0..N-1)
+    NUM_CLASSES = len(CLASS_CONFIG)
+    IS_EPI = np.array([cfg["is_epi"] for cfg in CLASS_CONFIG.values()], dtype=bool)
+    IS_VIOLATION = np.array([cfg["is_violation"] for cfg in CLASS_CONFIG.values()], dtype=bool)
+    PERSON_CLASS_ID = 6
+    
+    # Ordem dos alertas de violação no painel
+    ALERT_CLASS_IDS = (7, 8, 9, 10, 5)
+    
+    # Tamanho do frame anotado (largura, altura), lado maior da entrada do
+    # modelo e stride máximo da rede (as dimensões da entrada são múltiplas dele)
+    DISPLAY_SIZE = (640, 480)
+    INPUT_SIZE = 640
+    MODEL_STRIDE = 32
+    
+    def __init__(self, model_path: str = None, max_batch: int = 1):
         """
         Inicializa o detector com o modelo YOLOv8 de EPI.
         
         Args:
             model_path: Caminho para o modelo. Se None, usa o modelo padrão de EPI.
+            max_batch: Número máximo de frames processados em uma chamada ao modelo
         """
-        self.lock = threading.Lock()
+        self.max_batch = max_batch
         
         # Usar modelo de EPI na pasta models
         if model_path is None:
@@ -54,157 +87,466 @@ class EPIDetector:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Modelo não encontrado: {model_path}")
         
-        self.model = YOLO(model_path)
-        print(f"✅ Modelo de EPI carregado: {model_path}")
+        self.model = self._load_model(model_path, max_batch)
+        
+        # Em GPU, inferência em FP16 (o engine TensorRT já é FP16; para o .pt
+        # o ultralytics converte os pesos na primeira chamada)
+        self._device = 0 if torch.cuda.is_available() else "cpu"
+        self._half = torch.cuda.is_available()
+        
+        # Geometria do letterbox (frame de exibição -> entrada do modelo), calculada
+        # uma vez e reaproveitada em todos os frames. Os modelos exportados têm
+        # forma dinâmica, então a entrada é retangular com padding apenas até o
+        # múltiplo do stride (640x480 não precisa de padding), em vez de quadrada
+        display_w, display_h = self.DISPLAY_SIZE
+        self._gain = min(self.INPUT_SIZE / display_w, self.INPUT_SIZE / display_h)
+        resized_w, resized_h = round(display_w * self._gain), round(display_h * self._gain)
+        input_w = -(-resized_w // self.MODEL_STRIDE) * self.MODEL_STRIDE
+        input_h = -(-resized_h // self.MODEL_STRIDE) * self.MODEL_STRIDE
+        pad_x = (input_w - resized_w) // 2
+        pad_y = (input_h - resized_h) // 2
+        self._resized_size = (resized_w, resized_h)
+        self._input_shape = (input_h, input_w)
+        self._pad_xyxy = np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+        
+        # Buffer de entrada do lote reutilizado entre chamadas (bordas já preenchidas)
+        self._input_buf = np.full(
+            (max_batch, input_h, input_w, 3), 114, dtype=np.uint8
+        )
+        self._input_rois = [
+            image[pad_y:pad_y + resized_h, pad_x:pad_x + resized_w] for image in self._input_buf
+        ]
+        
+        # Labels por classe: prefixo "Nome: " e tamanho do texto para 1, 2 e 3
+        # dígitos de porcentagem (os dígitos da fonte Hershey têm a mesma largura)
+        self._labels = {cls_id: self._measure_label(cfg["name"]) for cls_id, cfg in self.CLASS_CONFIG.items()}
+        
+        # Molduras e títulos estáticos dos painéis pré-renderizados
+        max_alerts = sum(1 for cfg in self.CLASS_CONFIG.values() if cfg["is_violation"])
+        self._alert_templates = {n: self._render_alert_template(n) for n in range(1, max_alerts + 1)}
+        self._summary_template = self._render_summary_template()
+        self._people_prefix_w = cv2.getTextSize("Pessoas: ", cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0][0]
+        self._epi_prefix_w = cv2.getTextSize("EPIs: ", cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0][0]
         
         # Verificar classes do modelo
         if hasattr(self.model, 'names'):
             print(f"📋 Classes do modelo: {self.model.names}")
+        
+        # Aquecimento: paga o custo de inicialização do predictor e dos kernels
+        # antes de atender o primeiro frame real
+        display_w, display_h = self.DISPLAY_SIZE
+        self.detect(np.zeros((display_h, display_w, 3), dtype=np.uint8))
+        print("🔥 Modelo aquecido")
+    
+    @classmethod
+    def _load_model(cls, model_path: str, max_batch: int) -> YOLO:
+        """
+        Carrega o modelo no formato otimizado para o hardware disponível.
+        
+        Em GPU usa um engine TensorRT FP16; em CPU usa o modelo ONNX INT8
+        (`<modelo>_int8.onnx`, gerado por `download_epi_model.py quantize`)
+        se existir, senão OpenVINO. O modelo exportado é salvo ao lado do
+        arquivo .pt (com o tamanho máximo de lote no nome), então a conversão
+        só é refeita quando o .pt for mais novo que ele (modelo re-treinado).
+        
+        Os pacotes de cada backend (tensorrt/onnx, openvino, onnxruntime) são
+        opcionais: se não estiverem instalados, usa o .pt direto, sem deixar o
+        ultralytics tentar instalá-los durante a inicialização. Se a exportação
+        falhar, também usa o .pt.
+        
+        Args:
+            model_path: Caminho para o modelo PyTorch (.pt)
+            max_batch: Tamanho máximo de lote suportado pelo modelo exportado
+        """
+        int8_path = f"{os.path.splitext(model_path)[0]}_int8.onnx"
+        if not torch.cuda.is_available() and os.path.exists(int8_path):
+            if cls._is_stale(int8_path, model_path):
+                print(f"⚠️ {int8_path} é mais antigo que {model_path}; ignorando "
+                      f"(execute 'python download_epi_model.py quantize' novamente)")
+            elif cls._missing_modules(("onnxruntime",)):
+                print(f"⚠️ onnxruntime não instalado; ignorando {int8_path}")
+            else:
+                # Quantizado com lote dinâmico: atende qualquer max_batch
+                print(f"✅ Modelo de EPI carregado (ONNX INT8): {int8_path}")
+                return YOLO(int8_path, task="detect")
+        
+        base_path = f"{os.path.splitext(model_path)[0]}_b{max_batch}"
+        if torch.cuda.is_available():
+            export_format = "engine"
+            export_args = {"half": True}
+            exported_path = base_path + ".engine"
+            required_modules = ("tensorrt", "onnx")
+        else:
+            export_format = "openvino"
+            export_args = {}
+            exported_path = base_path + "_openvino_model"
+            required_modules = ("openvino",)
+        
+        missing = cls._missing_modules(required_modules)
+        if missing:
+            print(f"⚠️ {', '.join(missing)} não instalado(s): formato {export_format} desativado "
+                  f"(pip install {' '.join(missing)} para habilitar)")
+            print(f"✅ Modelo de EPI carregado (PyTorch): {model_path}")
+            return YOLO(model_path)
+        
+        if os.path.exists(exported_path) and cls._is_stale(exported_path, model_path):
+            print(f"♻️ {model_path} foi atualizado; descartando {exported_path}")
+            if os.path.isdir(exported_path):
+                shutil.rmtree(exported_path)
+            else:
+                os.remove(exported_path)
+        
+        if not os.path.exists(exported_path):
+            print(f"⚙️ Exportando modelo para {export_format} (apenas na primeira execução; pode levar alguns minutos)...")
+            try:
+                # Lote dinâmico (1..max_batch) para aceitar lotes parciais
+                output_path = YOLO(model_path).export(
+                    format=export_format,
+                    imgsz=cls.INPUT_SIZE,
+                    dynamic=True,
+                    batch=max_batch,
+                    **export_args
+                )
+                os.replace(output_path, exported_path)
+            except Exception as e:
+                print(f"⚠️ Falha ao exportar modelo para {export_format}: {e}")
+                print(f"✅ Modelo de EPI carregado (PyTorch): {model_path}")
+                return YOLO(model_path)
+        
+        print(f"✅ Modelo de EPI carregado ({export_format}): {exported_path}")
+        return YOLO(exported_path, task="detect")
+    
+    @staticmethod
+    def _missing_modules(modules: Tuple[str, ...]) -> List[str]:
+        """Retorna os módulos da lista que não estão instalados."""
+        return [module for module in modules if importlib.util.find_spec(module) is None]
     
-    def get_class_info(self, class_id: int) -> Dict:
+    @staticmethod
+    def _is_stale(artifact_path: str, model_path: str) -> bool:
+        """Indica se o modelo exportado é mais antigo que o .pt de origem."""
+        return os.path.getmtime(artifact_path) < os.path.getmtime(model_path)
+    
+    @staticmethod
+    def _measure_label(name: str) -> Tuple[str, List[Tuple[int, int]]]:
+        """Retorna o prefixo do label e seus tamanhos para porcentagens de 1 a 3 dígitos."""
+        prefix = f"{name}: "
+        sizes = [
+            cv2.getTextSize(f"{prefix}{'9' * digits}%", cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+            for digits in (1, 2, 3)
+        ]
+        return prefix, sizes
+    
+    @staticmethod
+    def _render_alert_template(alert_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Pré-renderiza moldura e título do painel de alertas (origem no canto do frame)."""
+        panel_height = 30 + alert_count * 25
+        template = np.zeros((panel_height + 2, 302, 3), dtype=np.uint8)
+        mask = np.zeros(template.shape[:2], dtype=np.uint8)
+        
+        for canvas, fill, border in ((template, (0, 0, 0), (0, 0, 255)), (mask, 255, 255)):
+            cv2.rectangle(canvas, (5, 5), (300, panel_height), fill, -1)
+            cv2.rectangle(canvas, (5, 5), (300, panel_height), border, 2)
+        
+        cv2.putText(template, "ALERTAS DE SEGURANCA", (10, 25),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        
+        return template, mask.astype(bool)[..., None]
+    
+    @staticmethod
+    def _render_summary_template() -> Tuple[np.ndarray, np.ndarray]:
+        """Pré-renderiza moldura e rótulos do painel de resumo (origem 2px acima do painel)."""
+        template = np.zeros((62, 352, 3), dtype=np.uint8)
+        mask = np.zeros(template.shape[:2], dtype=np.uint8)
+        
+        for canvas, fill, border in ((template, (0, 0, 0), (255, 255, 255)), (mask, 255, 255)):
+            cv2.rectangle(canvas, (5, 2), (350, 57), fill, -1)
+            cv2.rectangle(canvas, (5, 2), (350, 57), border, 1)
+        
+        cv2.putText(template, "Pessoas: ", (15, 22),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        cv2.putText(template, "EPIs: ", (130, 22),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        
+        return template, mask.astype(bool)[..., None]
+    
+    @staticmethod
+    def _blit(frame: np.ndarray, template: Tuple[np.ndarray, np.ndarray], x: int, y: int):
+        """Copia um template pré-renderizado para o frame na posição (x, y)."""
+        image, mask = template
+        h, w = image.shape[:2]
+        np.copyto(frame[y:y + h, x:x + w], image, where=mask)
+    
+    @classmethod
+    def get_class_info(cls, class_id: int) -> Dict:
         """Obtém informações da classe pelo ID."""
-        return self.CLASS_CONFIG.get(class_id, {
+        return cls.CLASS_CONFIG.get(class_id, {
             "name": f"Classe {class_id}",
             "color": (128, 128, 128),
             "is_epi": False,
             "is_violation": False
         })
     
-    def detect(self, frame: np.ndarray, confidence: float = 0.5) -> Tuple[np.ndarray, List[Dict]]:
+    @classmethod
+    def _summarize(cls, cls_ids: np.ndarray) -> Tuple[int, int, int, np.ndarray]:
+        """
+        Conta EPIs, violações e pessoas em uma única passada sobre os IDs de classe.
+        
+        Returns:
+            Tuple com (epi_count, violation_count, person_count, contagem por classe)
+        """
+        counts = np.bincount(cls_ids, minlength=cls.NUM_CLASSES)[:cls.NUM_CLASSES]
+        epi_count = int(counts.dot(cls.IS_EPI))
+        violation_count = int(counts.dot(cls.IS_VIOLATION))
+        return epi_count, violation_count, int(counts[cls.PERSON_CLASS_ID]), counts
+    
+    @classmethod
+    def summarize(cls, detections: Detections) -> Dict[str, int]:
+        """Resume as detecções em contagens de pessoas, EPIs e violações."""
+        epi_count, violation_count, person_count, _ = cls._summarize(detections.cls_ids)
+        return {
+            "person_count": person_count,
+            "epi_count": epi_count,
+            "violation_count": violation_count,
+        }
+    
+    @classmethod
+    def to_dicts(cls, detections: Detections, violations_only: bool = False) -> List[Dict]:
+        """
+        Converte as detecções para lista de dicionários (formato da API).
+        
+        Args:
+            detections: Detecções em arrays paralelos
+            violations_only: Se True, retorna apenas as violações
+        """
+        result = []
+        for cls_id, conf, bbox in zip(detections.cls_ids.tolist(), detections.confs.tolist(), detections.xyxy.tolist()):
+            class_info = cls.get_class_info(cls_id)
+            if violations_only and not class_info["is_violation"]:
+                continue
+            result.append({
+                "class": class_info["name"],
+                "class_id": cls_id,
+                "confidence": conf,
+                "bbox": bbox,
+                "is_epi": class_info["is_epi"],
+                "is_violation": class_info["is_violation"]
+            })
+        return result
+    
+    def fit_display(self, frame: np.ndarray, inplace: bool = True) -> np.ndarray:
+        """
+        Retorna o frame em DISPLAY_SIZE sobre o qual as anotações serão desenhadas.
+        
+        O redimensionamento já gera um novo buffer; se o frame já está no
+        tamanho de exibição, ele só é copiado quando `inplace` é False.
+        """
+        if frame.shape[1::-1] != self.DISPLAY_SIZE:
+            return cv2.resize(frame, self.DISPLAY_SIZE)
+        return frame if inplace else frame.copy()
+    
+    def _letterbox(self, frame: np.ndarray, index: int):
+        """Copia o frame de exibição para a posição `index` do buffer de entrada."""
+        if self._resized_size == self.DISPLAY_SIZE:
+            np.copyto(self._input_rois[index], frame)
+        else:
+            self._input_rois[index][...] = cv2.resize(frame, self._resized_size)
+    
+    def _to_display_coords(self, xyxy: np.ndarray) -> np.ndarray:
+        """Converte caixas da entrada do modelo para coordenadas do frame de exibição."""
+        xyxy = (xyxy - self._pad_xyxy) / self._gain
+        display_w, display_h = self.DISPLAY_SIZE
+        np.clip(xyxy[:, 0::2], 0, display_w - 1, out=xyxy[:, 0::2])
+        np.clip(xyxy[:, 1::2], 0, display_h - 1, out=xyxy[:, 1::2])
+        return xyxy.astype(np.int32)
+    
+    def detect(self, frame: np.ndarray, confidence: float = 0.5, inplace: bool = True) -> Tuple[np.ndarray, Detections]:
         """
         Detecta EPIs em um frame.
         
+        O frame é redimensionado para DISPLAY_SIZE (se necessário) e as
+        detecções são desenhadas nessa resolução.
+        
         Args:
-            frame: Frame de vídeo (BGR)
+            frame: Frame de vídeo (BGR) em qualquer resolução
             confidence: Limiar de confiança para detecções
+            inplace: Desenhar diretamente sobre `frame` (sem cópia) quando ele
+                já está em DISPLAY_SIZE; use False se o frame original for reutilizado
             
         Returns:
             Tuple contendo o frame anotado e lista de detecções
         """
-        with self.lock:
-            # Realizar detecção
-            results = self.model(frame, conf=confidence, verbose=False)
+        return self.detect_batch([frame], confidence, inplace)[0]
+    
+    def detect_batch(self, frames: List[np.ndarray], confidence: float = 0.5, inplace: bool = True) -> List[Tuple[np.ndarray, Detections]]:
+        """
+        Detecta EPIs em um lote de frames com uma única chamada ao modelo.
+        
+        Não é thread-safe (o buffer de entrada é compartilhado): as chamadas
+        são serializadas pelo worker único do InferenceScheduler.
+        
+        Args:
+            frames: Frames de vídeo (BGR), no máximo `max_batch`
+            confidence: Limiar de confiança para detecções
+            inplace: Desenhar diretamente sobre os frames recebidos (ver `detect`)
             
-            detections = []
-            annotated_frame = frame.copy()
+        Returns:
+            Lista com o frame anotado e as detecções de cada frame
+        """
+        if len(frames) > self.max_batch:
+            raise ValueError(f"Lote com {len(frames)} frames excede o máximo de {self.max_batch}")
+        
+        frames = [self.fit_display(frame, inplace) for frame in frames]
+        
+        # Realizar detecção sobre o buffer já no tamanho de entrada
+        for i, frame in enumerate(frames):
+            self._letterbox(frame, i)
+        with torch.inference_mode():
+            results = self.model(
+                list(self._input_buf[:len(frames)]),
+                conf=confidence,
+                imgsz=self._input_shape,
+                half=self._half,
+                device=self._device,
+                verbose=False
+            )
+        
+        return [self._annotate(frame, result) for frame, result in zip(frames, results)]
+    
+    def _annotate(self, frame: np.ndarray, result) -> Tuple[np.ndarray, Detections]:
+        """Extrai as detecções de um resultado do modelo e as desenha sobre o frame."""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            detections = Detections.empty()
+        else:
+            # Uma única cópia por array, sem iterar caixa a caixa sobre os tensores
+            detections = Detections(
+                cls_ids=boxes.cls.to(torch.int32).cpu().numpy(),
+                confs=boxes.conf.cpu().numpy(),
+                xyxy=self._to_display_coords(boxes.xyxy.cpu().numpy())
+            )
+        
+        return self._draw_detections(frame, detections), detections
+    
+    def annotate(self, frame: np.ndarray, detections: Detections, alerts: List[str], inplace: bool = True) -> np.ndarray:
+        """
+        Desenha detecções já obtidas (caixas e painel de status) sobre um novo frame,
+        sem executar o modelo.
+        
+        Args:
+            frame: Frame de vídeo (BGR) em qualquer resolução
+            detections: Detecções de um frame anterior
+            alerts: Alertas correspondentes às detecções
+            inplace: Desenhar diretamente sobre `frame` (ver `detect`)
+            
+        Returns:
+            Frame anotado em DISPLAY_SIZE
+        """
+        annotated_frame = self._draw_detections(self.fit_display(frame, inplace), detections)
+        self._draw_status_panel(annotated_frame, self._summarize(detections.cls_ids), alerts)
+        return annotated_frame
+    
+    def _draw_detections(self, annotated_frame: np.ndarray, detections: Detections) -> np.ndarray:
+        """Desenha caixas e labels das detecções diretamente sobre o frame."""
+        for cls_id, conf, (x1, y1, x2, y2) in zip(detections.cls_ids.tolist(), detections.confs.tolist(), detections.xyxy.tolist()):
+            # Obter informações da classe
+            class_info = self.get_class_info(cls_id)
+            
+            # Cor e espessura baseada no tipo
+            color = class_info["color"]
+            thickness = 3 if class_info["is_violation"] else 2
             
-            for result in results:
-                boxes = result.boxes
-                
-                if boxes is not None:
-                    for box in boxes:
-                        # Extrair coordenadas
-                        x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                        conf = float(box.conf[0])
-                        cls_id = int(box.cls[0])
-                        
-                        # Obter informações da classe
-                        class_info = self.get_class_info(cls_id)
-                        
-                        # Adicionar à lista de detecções
-                        detections.append({
-                            "class": class_info["name"],
-                            "class_id": cls_id,
-                            "confidence": conf,
-                            "bbox": [x1, y1, x2, y2],
-                            "is_epi": class_info["is_epi"],
-                            "is_violation": class_info["is_violation"]
-                        })
-                        
-                        # Cor e espessura baseada no tipo
-                        color = class_info["color"]
-                        thickness = 3 if class_info["is_violation"] else 2
-                        
-                        # Desenhar bounding box
-                        cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, thickness)
-                        
-                        # Desenhar label
-                        label = f"{class_info['name']}: {conf:.0%}"
-                        label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-                        
-                        # Background do label
-                        label_y = max(y1 - 10, label_size[1] + 10)
-                        cv2.rectangle(
-                            annotated_frame,
-                            (x1, label_y - label_size[1] - 5),
-                            (x1 + label_size[0] + 5, label_y + 5),
-                            color,
-                            -1
-                        )
-                        
-                        # Texto do label
-                        cv2.putText(
-                            annotated_frame,
-                            label,
-                            (x1 + 2, label_y),
-                            cv2.FONT_HERSHEY_SIMPLEX,
-                            0.6,
-                            (255, 255, 255),
-                            2
-                        )
+            # Desenhar bounding box
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, thickness)
             
-            return annotated_frame, detections
+            # Desenhar label (tamanho pré-calculado; classes desconhecidas medidas uma vez)
+            if cls_id not in self._labels:
+                self._labels[cls_id] = self._measure_label(class_info["name"])
+            prefix, sizes = self._labels[cls_id]
+            percent = round(conf * 100)
+            label = f"{prefix}{percent}%"
+            label_size = sizes[len(str(percent)) - 1]
+            
+            # Background do label
+            label_y = max(y1 - 10, label_size[1] + 10)
+            cv2.rectangle(
+                annotated_frame,
+                (x1, label_y - label_size[1] - 5),
+                (x1 + label_size[0] + 5, label_y + 5),
+                color,
+                -1
+            )
+            
+            # Texto do label
+            cv2.putText(
+                annotated_frame,
+                label,
+                (x1 + 2, label_y),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.6,
+                (255, 255, 255),
+                2
+            )
+        
+        return annotated_frame
     
-    def detect_with_epi_check(self, frame: np.ndarray, confidence: float = 0.5) -> Tuple[np.ndarray, List[Dict], List[str]]:
+    def detect_with_epi_check(self, frame: np.ndarray, confidence: float = 0.5, inplace: bool = True) -> Tuple[np.ndarray, Detections, List[str]]:
         """
         Detecta EPIs e gera alertas para violações de segurança.
         
         Args:
             frame: Frame de vídeo (BGR)
             confidence: Limiar de confiança
+            inplace: Desenhar diretamente sobre `frame` (ver `detect`)
             
         Returns:
             Tuple com frame anotado, detecções e lista de alertas
         """
-        annotated_frame, detections = self.detect(frame, confidence)
-        alerts = []
-        
-        # Contar violações por tipo
-        violations = {
-            "Sem Capacete": 0,
-            "Sem Óculos": 0,
-            "Sem Luvas": 0,
-            "Sem Botas": 0,
-            "Sem EPI": 0,
-        }
+        annotated_frame, detections = self.detect(frame, confidence, inplace)
+        return annotated_frame, detections, self._check_epi(annotated_frame, detections)
+    
+    def detect_batch_with_epi_check(self, frames: List[np.ndarray], confidence: float = 0.5, inplace: bool = True) -> List[Tuple[np.ndarray, Detections, List[str]]]:
+        """
+        Versão em lote de `detect_with_epi_check`.
         
-        for d in detections:
-            if d["is_violation"] and d["class"] in violations:
-                violations[d["class"]] += 1
+        Args:
+            frames: Frames de vídeo (BGR), no máximo `max_batch`
+            confidence: Limiar de confiança
+            inplace: Desenhar diretamente sobre os frames recebidos (ver `detect`)
+            
+        Returns:
+            Lista com frame anotado, detecções e alertas de cada frame
+        """
+        return [
+            (annotated_frame, detections, self._check_epi(annotated_frame, detections))
+            for annotated_frame, detections in self.detect_batch(frames, confidence, inplace)
+        ]
+    
+    def _check_epi(self, annotated_frame: np.ndarray, detections: Detections) -> List[str]:
+        """Gera alertas para violações e desenha o painel de status no frame."""
+        summary = self._summarize(detections.cls_ids)
+        counts = summary[3]
         
         # Gerar alertas para cada tipo de violação
-        for violation_type, count in violations.items():
-            if count > 0:
-                alerts.append(f"⚠️ {count}x {violation_type}")
-        
-        # Contar EPIs detectados
-        epis = {}
-        for d in detections:
-            if d["is_epi"]:
-                epis[d["class"]] = epis.get(d["class"], 0) + 1
+        alerts = [
+            f"⚠️ {counts[cls_id]}x {self.CLASS_CONFIG[cls_id]['name']}"
+            for cls_id in self.ALERT_CLASS_IDS
+            if counts[cls_id] > 0
+        ]
         
         # Desenhar painel de status no frame
-        self._draw_status_panel(annotated_frame, detections, alerts)
+        self._draw_status_panel(annotated_frame, summary, alerts)
         
-        return annotated_frame, detections, alerts
+        return alerts
     
-    def _draw_status_panel(self, frame: np.ndarray, detections: List[Dict], alerts: List[str]):
-        """Desenha painel de status no frame."""
+    def _draw_status_panel(self, frame: np.ndarray, summary: Tuple[int, int, int, np.ndarray], alerts: List[str]):
+        """Desenha painel de status no frame a partir do resultado de `_summarize`."""
         h, w = frame.shape[:2]
         
-        # Contar EPIs e violações
-        epi_count = sum(1 for d in detections if d["is_epi"])
-        violation_count = sum(1 for d in detections if d["is_violation"])
-        person_count = sum(1 for d in detections if d["class"] == "Pessoa")
+        epi_count, violation_count, person_count, _ = summary
         
         # Painel superior esquerdo - Alertas
         if alerts:
-            panel_height = 30 + len(alerts) * 25
-            cv2.rectangle(frame, (5, 5), (300, panel_height), (0, 0, 0), -1)
-            cv2.rectangle(frame, (5, 5), (300, panel_height), (0, 0, 255), 2)
-            
-            cv2.putText(frame, "ALERTAS DE SEGURANCA", (10, 25),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+            self._blit(frame, self._alert_templates[len(alerts)], 0, 0)
             
             y_pos = 50
             for alert in alerts:
@@ -214,21 +556,24 @@ class EPIDetector:
         
         # Painel inferior - Resumo
         panel_y = h - 60
-        cv2.rectangle(frame, (5, panel_y), (350, h - 5), (0, 0, 0), -1)
-        cv2.rectangle(frame, (5, panel_y), (350, h - 5), (255, 255, 255), 1)
+        self._blit(frame, self._summary_template, 0, panel_y - 2)
         
         # Status geral
         status_color = (0, 255, 0) if violation_count == 0 else (0, 0, 255)
         status_text = "OK" if violation_count == 0 else f"{violation_count} VIOLACOES"
         
-        cv2.putText(frame, f"Pessoas: {person_count}", (15, panel_y + 20),
+        # Apenas os valores mudam a cada frame; os rótulos vêm do template
+        cv2.putText(frame, str(person_count), (15 + self._people_prefix_w, panel_y + 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        cv2.putText(frame, f"EPIs: {epi_count}", (130, panel_y + 20),
+        cv2.putText(frame, str(epi_count), (130 + self._epi_prefix_w, panel_y + 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
         cv2.putText(frame, f"Status: {status_text}", (15, panel_y + 45),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, status_color, 2)
 
 
+# Tamanho máximo do lote de inferência (frames de câmeras diferentes)
+MAX_BATCH = int(os.environ.get("EPI_MAX_BATCH", "8"))
+
 # Singleton do detector para reutilização
 _detector_instance = None
 
@@ -237,10 +582,15 @@ def get_detector() -> EPIDetector:
     """Retorna instância singleton do detector."""
     global _detector_instance
     if _detector_instance is None:
-        _detector_instance = EPIDetector()
+        _detector_instance = EPIDetector(max_batch=MAX_BATCH)
     return _detector_instance
 
 
+def is_detector_ready() -> bool:
+    """Indica se o detector já foi carregado e aquecido."""
+    return _detector_instance is not None
+
+
 def reset_detector():
     """Reseta o detector para recarregar com novo modelo."""
     global _detector_instance
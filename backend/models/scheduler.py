@@ -0,0 +1,119 @@
+import asyncio
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+
+from .detector import MAX_BATCH, Detections, EPIDetector, get_detector
+
+# Tempo máximo (ms) que o primeiro frame de um lote espera por outros frames
+MAX_WAIT_MS = float(os.environ.get("EPI_MAX_WAIT_MS", "5"))
+
+
+class InferenceScheduler:
+    """
+    Agrupa frames de várias câmeras em lotes e executa a inferência em um
+    único worker assíncrono.
+    
+    Cada stream chama `submit(frame)` e aguarda o resultado; o worker junta
+    até `max_batch` frames que chegarem dentro de `max_wait_ms` e faz uma
+    única chamada ao detector em uma thread do pool.
+    """
+    
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS, confidence: float = 0.5):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.confidence = confidence
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._detector: Optional[EPIDetector] = None
+    
+    async def start(self):
+        """
+        Inicia o worker de inferência no event loop atual. O detector é obtido
+        uma única vez aqui (já carregado no startup da aplicação).
+        """
+        if self._worker is None:
+            self._detector = await run_in_threadpool(get_detector)
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+            print(f"🚀 Scheduler de inferência iniciado (lote máx.: {self.max_batch}, espera: {self.max_wait * 1000:.0f}ms)")
+    
+    async def stop(self):
+        """Cancela o worker de inferência."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+    
+    async def submit(self, frame: np.ndarray) -> Tuple[np.ndarray, Detections, List[str]]:
+        """
+        Envia um frame para detecção e aguarda o resultado.
+        
+        Args:
+            frame: Frame de vídeo (BGR)
+        
+        Returns:
+            Tuple com frame anotado, detecções e lista de alertas
+        """
+        if self._worker is None:
+            raise RuntimeError("Scheduler de inferência não iniciado")
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future))
+        return await future
+    
+    def _drain(self, batch: List):
+        """Move para o lote os frames já enfileirados, até `max_batch`."""
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+    
+    async def _collect_batch(self) -> List:
+        """Aguarda o primeiro frame e junta os que chegarem na janela de espera."""
+        batch = [await self._queue.get()]
+        self._drain(batch)
+        
+        if len(batch) < self.max_batch and self.max_wait > 0:
+            await asyncio.sleep(self.max_wait)
+            self._drain(batch)
+        
+        # Descartar frames de clientes que já desconectaram
+        return [(frame, future) for frame, future in batch if not future.cancelled()]
+    
+    async def _run(self):
+        """Loop do worker: coleta lotes e resolve os futures de cada frame."""
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+            
+            frames = [frame for frame, _ in batch]
+            try:
+                outputs = await run_in_threadpool(
+                    self._detector.detect_batch_with_epi_check, frames, self.confidence
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+
+# Singleton do scheduler para reutilização
+_scheduler_instance = None
+
+
+def get_scheduler() -> InferenceScheduler:
+    """Retorna instância singleton do scheduler de inferência."""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        _scheduler_instance = InferenceScheduler()
+    return _scheduler_instance
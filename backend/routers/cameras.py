@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, List
+import threading
 import uuid
 
 from schemas.camera import CameraCreate, CameraResponse, CameraUpdate
@@ -9,6 +10,12 @@ router = APIRouter(prefix="/api/cameras", tags=["cameras"])
 # Armazenamento em memória das câmeras (em produção, usar banco de dados)
 cameras_db: Dict[str, CameraResponse] = {}
 
+# Índice nome (minúsculo) -> ID, para checar nomes duplicados sem varrer cameras_db
+name_index: Dict[str, str] = {}
+
+# Protege atualizações conjuntas de cameras_db e name_index
+cameras_lock = threading.Lock()
+
 
 @router.get("/", response_model=List[CameraResponse])
 async def list_cameras():
@@ -27,66 +34,93 @@ async def get_camera(camera_id: str):
 @router.post("/", response_model=CameraResponse, status_code=201)
 async def create_camera(camera: CameraCreate):
     """Cria uma nova câmera."""
-    # Verificar se já existe uma câmera com o mesmo nome
-    for existing_camera in cameras_db.values():
-        if existing_camera.name.lower() == camera.name.lower():
+    name_key = camera.name.lower()
+    
+    with cameras_lock:
+        # Verificar se já existe uma câmera com o mesmo nome
+        if name_key in name_index:
             raise HTTPException(
                 status_code=400,
                 detail=f"Já existe uma câmera com o nome '{camera.name}'"
             )
+        
+        # Criar nova câmera
+        camera_id = str(uuid.uuid4())
+        new_camera = CameraResponse(
+            id=camera_id,
+            name=camera.name,
+            url=camera.url,
+            fps=camera.fps,
+            detect_every_n=camera.detect_every_n,
+            active=True
+        )
+        
+        cameras_db[camera_id] = new_camera
+        name_index[name_key] = camera_id
     
-    # Criar nova câmera
-    camera_id = str(uuid.uuid4())
-    new_camera = CameraResponse(
-        id=camera_id,
-        name=camera.name,
-        url=camera.url,
-        fps=camera.fps,
-        active=True
-    )
+    # Iniciar captura e detecção em segundo plano (import local: stream depende deste módulo)
+    from routers.stream import start_camera_pump
+    start_camera_pump(camera_id)
     
-    cameras_db[camera_id] = new_camera
     return new_camera
 
 
 @router.put("/{camera_id}", response_model=CameraResponse)
 async def update_camera(camera_id: str, camera_update: CameraUpdate):
     """Atualiza uma câmera existente."""
-    if camera_id not in cameras_db:
-        raise HTTPException(status_code=404, detail="Câmera não encontrada")
-    
-    existing_camera = cameras_db[camera_id]
-    
-    # Verificar nome duplicado se estiver atualizando o nome
-    if camera_update.name and camera_update.name.lower() != existing_camera.name.lower():
-        for cam in cameras_db.values():
-            if cam.id != camera_id and cam.name.lower() == camera_update.name.lower():
+    with cameras_lock:
+        if camera_id not in cameras_db:
+            raise HTTPException(status_code=404, detail="Câmera não encontrada")
+        
+        existing_camera = cameras_db[camera_id]
+        old_key = existing_camera.name.lower()
+        
+        # Verificar nome duplicado se estiver atualizando o nome
+        if camera_update.name and camera_update.name.lower() != old_key:
+            if camera_update.name.lower() in name_index:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Já existe uma câmera com o nome '{camera_update.name}'"
                 )
+        
+        # Atualizar campos
+        update_data = camera_update.model_dump(exclude_unset=True)
+        updated_camera = CameraResponse(
+            id=existing_camera.id,
+            name=update_data.get("name", existing_camera.name),
+            url=update_data.get("url", existing_camera.url),
+            fps=update_data.get("fps", existing_camera.fps),
+            detect_every_n=update_data.get("detect_every_n", existing_camera.detect_every_n),
+            active=update_data.get("active", existing_camera.active)
+        )
+        
+        cameras_db[camera_id] = updated_camera
+        name_index.pop(old_key, None)
+        name_index[updated_camera.name.lower()] = camera_id
     
-    # Atualizar campos
-    update_data = camera_update.model_dump(exclude_unset=True)
-    updated_camera = CameraResponse(
-        id=existing_camera.id,
-        name=update_data.get("name", existing_camera.name),
-        url=update_data.get("url", existing_camera.url),
-        fps=update_data.get("fps", existing_camera.fps),
-        active=update_data.get("active", existing_camera.active)
-    )
+    # Parar o pipeline ao desativar e reiniciá-lo ao ativar ou trocar a URL
+    from routers.stream import start_camera_pump, stop_camera_pump
+    if not updated_camera.active or updated_camera.url != existing_camera.url:
+        stop_camera_pump(camera_id, end_streams=False)
+    if updated_camera.active:
+        start_camera_pump(camera_id)
     
-    cameras_db[camera_id] = updated_camera
     return updated_camera
 
 
 @router.delete("/{camera_id}")
 async def delete_camera(camera_id: str):
     """Remove uma câmera."""
-    if camera_id not in cameras_db:
-        raise HTTPException(status_code=404, detail="Câmera não encontrada")
+    with cameras_lock:
+        if camera_id not in cameras_db:
+            raise HTTPException(status_code=404, detail="Câmera não encontrada")
+        
+        removed_camera = cameras_db.pop(camera_id)
+        name_index.pop(removed_camera.name.lower(), None)
+    
+    from routers.stream import stop_camera_pump
+    stop_camera_pump(camera_id)
     
-    del cameras_db[camera_id]
     return {"message": "Câmera removida com sucesso"}
 
 
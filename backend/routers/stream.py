@@ -1,19 +1,49 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+import asyncio
 import cv2
+import queue
 import time
-from typing import Dict, Generator, List
+from typing import AsyncGenerator, Dict, List, Optional, Set, Tuple
 import threading
+import xxhash
 
-from models.detector import get_detector
+from models.detector import Detections, EPIDetector, get_detector
+from models.scheduler import get_scheduler
 from routers.cameras import cameras_db
 
+# Codificador JPEG com SIMD (libjpeg-turbo), se disponível; senão usa o OpenCV
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    turbo_jpeg = None
+
+JPEG_QUALITY = 80
+
+# Intervalo máximo (s) sem reenviar um frame idêntico, mantendo o MJPEG ativo
+MAX_SKIP_SECONDS = 1.0
+
 router = APIRouter(prefix="/api/stream", tags=["stream"])
 
 # Armazenar VideoCapture ativos
 active_streams: Dict[str, cv2.VideoCapture] = {}
 stream_locks: Dict[str, threading.Lock] = {}
 
+# Pipeline (captura -> detecção -> codificação) em execução por câmera e
+# filas dos clientes HTTP conectados a cada câmera
+camera_pumps: Dict[str, Tuple[asyncio.Task, threading.Event]] = {}
+camera_subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+# Evento do pipeline mais recente de cada câmera, sinalizado quando ele libera o
+# VideoCapture: um novo pipeline só abre a câmera depois disso (webcams não
+# aceitam duas aberturas simultâneas)
+capture_released: Dict[str, threading.Event] = {}
+
+# Tempo máximo (s) de espera pela liberação do stream pelo pipeline anterior
+CAPTURE_RELEASE_TIMEOUT = 5.0
+
 # Armazenar alertas/detecções por câmera para exibição na interface
 camera_alerts: Dict[str, Dict] = {}
 alerts_lock = threading.Lock()
@@ -27,13 +57,58 @@ def parse_video_source(url: str):
     return url
 
 
+# Protocolos sempre ao vivo (sem duração definida)
+LIVE_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "udp://")
+
+
+def is_live_source(source, cap: cv2.VideoCapture) -> bool:
+    """
+    Indica se a fonte é ao vivo (webcam ou stream) em vez de um arquivo.
+    
+    Webcams e protocolos de streaming são sempre ao vivo; para as demais URLs
+    (ex.: http) decide pelo número de frames: um vídeo servido por HTTP tem
+    duração conhecida, um stream MJPEG de câmera não.
+    """
+    if isinstance(source, int) or source.lower().startswith(LIVE_SCHEMES):
+        return True
+    return cap.get(cv2.CAP_PROP_FRAME_COUNT) <= 0
+
+
+def open_video_capture(source) -> cv2.VideoCapture:
+    """
+    Abre um VideoCapture mantendo apenas o frame mais recente no buffer interno.
+    
+    Para arquivos e streams de rede tenta primeiro o backend FFmpeg com
+    decodificação por hardware (NVDEC, VAAPI, D3D11...); se não abrir, usa o
+    backend padrão do OpenCV.
+    """
+    cap = None
+    if not isinstance(source, int):
+        cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG, [
+            cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+            cv2.CAP_PROP_HW_DEVICE, 0,
+        ])
+        if cap.isOpened():
+            hw_accel = int(cap.get(cv2.CAP_PROP_HW_ACCELERATION))
+            print(f"Decodificação por hardware: {'ativa' if hw_accel else 'indisponível'} (modo {hw_accel})")
+        else:
+            cap.release()
+            cap = None
+    
+    if cap is None:
+        cap = cv2.VideoCapture(source)
+    
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
 def get_video_capture(camera_id: str, url: str) -> cv2.VideoCapture:
     """Obtém ou cria um VideoCapture para a câmera."""
     if camera_id not in active_streams or not active_streams[camera_id].isOpened():
         source = parse_video_source(url)
         print(f"Tentando abrir fonte de vídeo: {source} (tipo: {type(source).__name__})")
         
-        cap = cv2.VideoCapture(source)
+        cap = open_video_capture(source)
         
         if not cap.isOpened():
             error_msg = f"Não foi possível abrir o stream: '{url}'"
@@ -53,123 +128,440 @@ def get_video_capture(camera_id: str, url: str) -> cv2.VideoCapture:
     return active_streams[camera_id]
 
 
-def generate_frames(camera_id: str) -> Generator[bytes, None, None]:
-    """Gera frames processados com detecção de EPIs."""
-    if camera_id not in cameras_db:
-        print(f"Câmera {camera_id} não encontrada no banco de dados")
-        return
+def read_frame(camera_id: str, cap: cv2.VideoCapture, skip_until: float = 0):
+    """
+    Lê um frame do VideoCapture protegido pelo lock da câmera.
     
-    camera = cameras_db[camera_id]
+    Em fontes ao vivo, os frames que chegam antes de `skip_until` são apenas
+    avançados com `grab()` (sem decodificar); só o último é decodificado com
+    `retrieve()`. Isso evita decodificar frames que seriam descartados.
     
+    Args:
+        camera_id: ID da câmera
+        cap: VideoCapture da câmera
+        skip_until: Instante (time.monotonic()) até o qual os frames são descartados
+    """
+    with stream_locks.get(camera_id, threading.Lock()):
+        ret = cap.grab()
+        while ret and time.monotonic() < skip_until:
+            ret = cap.grab()
+        if not ret:
+            return False, None
+        return cap.retrieve()
+
+
+def encode_frame(frame) -> Optional[bytes]:
+    """Codifica o frame como JPEG."""
+    if turbo_jpeg is not None:
+        # Mesmo subsampling de croma (4:2:0) do cv2.imencode; o padrão do PyTurboJPEG é 4:2:2
+        return turbo_jpeg.encode(frame, quality=JPEG_QUALITY, pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+    
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not ret:
+        return None
+    return buffer.tobytes()
+
+
+def queue_get(q: queue.Queue, stop_evt: threading.Event):
+    """Aguarda um item da fila; retorna None se o pipeline for parado."""
+    while not stop_evt.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+def offer_latest_nowait(q: queue.Queue, item):
+    """Coloca um item na fila de threads sem bloquear, descartando o mais antigo se estiver cheia."""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def offer_latest(q: asyncio.Queue, item):
+    """Coloca um item na fila assíncrona descartando o mais antigo se estiver cheia."""
+    if q.full():
+        q.get_nowait()
+    q.put_nowait(item)
+
+
+def broadcast(camera_id: str, chunk: Optional[bytes]):
+    """Entrega um chunk MJPEG a todos os clientes da câmera (None encerra os streams)."""
+    for q in camera_subscribers.get(camera_id, ()):
+        offer_latest(q, chunk)
+
+
+def reconnect_capture(camera_id: str, camera, cap: cv2.VideoCapture, stop_evt: threading.Event) -> Optional[cv2.VideoCapture]:
+    """Tenta reabrir o stream da câmera. Retorna None se a reconexão falhar com erro."""
+    print(f"Frame não recebido da câmera {camera.name}, tentando reconectar...")
+    cap.release()
     try:
-        detector = get_detector()
+        source = parse_video_source(camera.url)
+        cap = open_video_capture(source)
+        if not cap.isOpened():
+            print(f"Falha ao reconectar à câmera {camera.name}")
+            stop_evt.wait(2)
+            return cap
+        if not stop_evt.is_set():
+            active_streams[camera_id] = cap
+        print(f"Reconectado à câmera {camera.name}")
+        stop_evt.wait(1)
+        return cap
     except Exception as e:
-        print(f"Erro ao carregar detector: {e}")
-        return
+        print(f"Erro ao reconectar: {e}")
+        return None
+
+
+def frame_reader(camera_id: str, cap: cv2.VideoCapture, read_q: asyncio.Queue, loop: asyncio.AbstractEventLoop,
+                 stop_evt: threading.Event, released: threading.Event):
+    """
+    Thread de leitura: captura frames no FPS da câmera e os envia para a detecção.
+    
+    O FPS é controlado por um prazo monotônico (`next_deadline`) que avança um
+    intervalo por frame, com uma única espera por frame. Os frames são entregues
+    à fila da etapa de detecção pelo event loop (descartando o mais antigo), sem
+    ocupar threads do pool. Ao terminar, envia None à detecção, libera o
+    VideoCapture e sinaliza `released`.
+    """
+    next_deadline = time.monotonic()
+    live = None
     
     try:
-        cap = get_video_capture(camera_id, camera.url)
-    except Exception as e:
-        print(f"Erro ao abrir stream: {e}")
-        return
+        while not stop_evt.is_set():
+            # Verificar se a câmera ainda existe e está ativa
+            camera = cameras_db.get(camera_id)
+            if camera is None:
+                break
+            
+            # Câmera desativada: update_camera para o pipeline e o reinicia ao reativar
+            if not camera.active:
+                break
+            
+            # Controlar FPS
+            frame_interval = 1.0 / camera.fps if camera.fps > 0 else 1.0 / 5
+            
+            if live is None:
+                live = is_live_source(parse_video_source(camera.url), cap)
+            
+            if live:
+                # Fonte ao vivo: descartar (grab) os frames até o próximo instante
+                ret, frame = read_frame(camera_id, cap, skip_until=next_deadline)
+            else:
+                # Arquivo: esperar até o próximo instante e ler apenas o frame usado
+                stop_evt.wait(max(0, next_deadline - time.monotonic()))
+                ret, frame = read_frame(camera_id, cap)
+            
+            if not ret:
+                cap = reconnect_capture(camera_id, camera, cap, stop_evt)
+                if cap is None:
+                    break
+                next_deadline = time.monotonic()
+                live = None
+                continue
+            
+            # Avançar o prazo; se ficou mais de um intervalo atrasado, reancorar
+            # em vez de ler vários frames seguidos para recuperar o atraso
+            now = time.monotonic()
+            next_deadline += frame_interval
+            if next_deadline < now - frame_interval:
+                next_deadline = now + frame_interval
+            
+            loop.call_soon_threadsafe(offer_latest, read_q, frame)
+    finally:
+        # Parar as demais etapas do pipeline e liberar o stream
+        stop_evt.set()
+        try:
+            loop.call_soon_threadsafe(offer_latest, read_q, None)
+        except RuntimeError:
+            pass  # Event loop já encerrado
+        if cap is not None:
+            with stream_locks.get(camera_id, threading.Lock()):
+                cap.release()
+            if active_streams.get(camera_id) is cap:
+                del active_streams[camera_id]
+        released.set()
+
+
+def frame_writer(camera_id: str, encode_q: queue.Queue, loop: asyncio.AbstractEventLoop, stop_evt: threading.Event):
+    """
+    Thread de escrita: codifica os frames anotados em JPEG e os envia aos clientes da câmera.
     
-    # Calcular intervalo entre frames baseado no FPS desejado
-    frame_interval = 1.0 / camera.fps if camera.fps > 0 else 1.0 / 5
-    last_frame_time = 0
+    Frames com o JPEG idêntico ao último enviado (cena estática) são descartados,
+    exceto a cada MAX_SKIP_SECONDS, para economizar banda e decodificação no navegador.
+    Sem clientes conectados, os frames não são codificados (a detecção continua
+    rodando para alimentar os alertas).
+    """
+    last_hash = None
+    last_sent = 0.0
     
-    while True:
-        current_time = time.time()
-        
-        # Verificar se a câmera ainda existe e está ativa
-        if camera_id not in cameras_db:
+    while not stop_evt.is_set():
+        annotated_frame = queue_get(encode_q, stop_evt)
+        if annotated_frame is None:
             break
         
-        camera = cameras_db[camera_id]
-        if not camera.active:
-            time.sleep(0.1)
-            continue
-        
-        # Controlar FPS
-        if current_time - last_frame_time < frame_interval:
-            time.sleep(0.01)
+        # Ninguém assistindo: não codificar; o próximo cliente recebe o primeiro frame
+        if not camera_subscribers.get(camera_id):
+            last_hash = None
             continue
         
-        # Capturar frame
-        with stream_locks.get(camera_id, threading.Lock()):
-            ret, frame = cap.read()
-        
-        if not ret:
-            # Tentar reconectar
-            print(f"Frame não recebido da câmera {camera.name}, tentando reconectar...")
-            cap.release()
-            try:
-                source = parse_video_source(camera.url)
-                cap = cv2.VideoCapture(source)
-                if not cap.isOpened():
-                    print(f"Falha ao reconectar à câmera {camera.name}")
-                    time.sleep(2)
-                    continue
-                active_streams[camera_id] = cap
-                print(f"Reconectado à câmera {camera.name}")
-                time.sleep(1)
-                continue
-            except Exception as e:
-                print(f"Erro ao reconectar: {e}")
-                break
-        
-        # Redimensionar para performance
-        frame = cv2.resize(frame, (640, 480))
-        
-        # Detectar EPIs
-        try:
-            annotated_frame, detections, alerts = detector.detect_with_epi_check(frame)
-            
-            # Armazenar alertas para consulta via API
-            with alerts_lock:
-                # Filtrar violações (classes 5, 7-10: Sem EPI, Sem Capacete, Sem Óculos, Sem Luvas, Sem Botas)
-                violations = [d for d in detections if d.get("class_id") in [5, 7, 8, 9, 10] or d.get("is_violation", False)]
-                
-                # Debug: Mostrar detecções a cada 30 frames
-                if int(current_time * 10) % 30 == 0 and detections:
-                    print(f"🔍 Detecções: {len(detections)} | Violações: {len(violations)} | Classes: {[d.get('class_id') for d in detections]}")
-                
-                camera_alerts[camera_id] = {
-                    "timestamp": current_time,
-                    "alerts": alerts,
-                    "violations": violations,
-                    "has_violations": len(violations) > 0,
-                    "person_count": sum(1 for d in detections if d.get("class_id") == 6),
-                    "epi_count": sum(1 for d in detections if d.get("is_epi", False))
-                }
-        except Exception as e:
-            print(f"Erro na detecção: {e}")
-            annotated_frame = frame
-        
-        # Adicionar informações da câmera
-        cv2.putText(
-            annotated_frame,
-            f"Camera: {camera.name} | FPS: {camera.fps}",
-            (10, annotated_frame.shape[0] - 10),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (255, 255, 255),
-            1
-        )
-        
         # Codificar frame como JPEG
-        ret, buffer = cv2.imencode('.jpg', annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        if not ret:
+        frame_bytes = encode_frame(annotated_frame)
+        if frame_bytes is None:
             continue
         
-        frame_bytes = buffer.tobytes()
+        # Pular frames idênticos ao último enviado
+        frame_hash = xxhash.xxh3_64_intdigest(frame_bytes)
+        now = time.monotonic()
+        if frame_hash == last_hash and now - last_sent < MAX_SKIP_SECONDS:
+            continue
+        last_hash = frame_hash
+        last_sent = now
         
         # Enviar frame no formato MJPEG
-        yield (
+        chunk = (
             b'--frame\r\n'
             b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n'
         )
+        loop.call_soon_threadsafe(broadcast, camera_id, chunk)
+
+
+def store_alerts(camera_id: str, detections: Detections, alerts: List[str], timestamp: float):
+    """Armazena o resultado da última detecção da câmera para consulta via API."""
+    summary = EPIDetector.summarize(detections)
+    
+    # Debug: Mostrar detecções a cada 30 frames
+    if int(timestamp * 10) % 30 == 0 and len(detections.cls_ids):
+        print(f"🔍 Detecções: {len(detections.cls_ids)} | Violações: {summary['violation_count']} | Classes: {detections.cls_ids.tolist()}")
+    
+    # As detecções só são convertidas para JSON quando o endpoint de alertas é chamado
+    with alerts_lock:
+        camera_alerts[camera_id] = {
+            "timestamp": timestamp,
+            "alerts": alerts,
+            "detections": detections,
+            "has_violations": summary["violation_count"] > 0,
+            "person_count": summary["person_count"],
+            "epi_count": summary["epi_count"]
+        }
+
+
+async def detect_frames(camera_id: str, read_q: asyncio.Queue, encode_q: queue.Queue, stop_evt: threading.Event):
+    """
+    Etapa de detecção: consome frames lidos e envia os frames anotados para codificação.
+    
+    O detector roda a cada `camera.detect_every_n` frames (0 = automático, pela
+    latência medida da detecção); nos demais, as últimas detecções e alertas são
+    redesenhados sobre o frame novo, evitando que a interface pisque.
+    
+    Cada frame lido é de uso exclusivo desta etapa, então as anotações são
+    desenhadas no próprio buffer (sem cópia) e o frame original não é reutilizado.
+    """
+    scheduler = get_scheduler()
+    detector = get_detector()
+    frame_idx = 0
+    last_result = None
+    detection_ms = 0.0
+    
+    try:
+        while not stop_evt.is_set():
+            frame = await read_q.get()
+            if frame is None:
+                break
+            
+            camera = cameras_db.get(camera_id)
+            if camera is None:
+                break
+            
+            current_time = time.time()
+            
+            detect_every_n = camera.detect_every_n
+            if detect_every_n <= 0:
+                detect_every_n = max(1, int(detection_ms * camera.fps / 1000))
+            reuse_last = last_result is not None and frame_idx % detect_every_n != 0
+            frame_idx += 1
+            
+            if reuse_last:
+                # Reaproveitar a última detecção neste frame
+                annotated_frame = await run_in_threadpool(detector.annotate, frame, *last_result)
+            else:
+                # Detectar EPIs (inferência agrupada em lote com outras câmeras)
+                try:
+                    start = time.perf_counter()
+                    annotated_frame, detections, alerts = await scheduler.submit(frame)
+                    
+                    # Média móvel da latência da detecção, usada no modo automático
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    detection_ms = elapsed_ms if detection_ms == 0 else 0.8 * detection_ms + 0.2 * elapsed_ms
+                    
+                    last_result = (detections, alerts)
+                    store_alerts(camera_id, detections, alerts, current_time)
+                except Exception as e:
+                    print(f"Erro na detecção: {e}")
+                    # Manter o tamanho de saída do stream mesmo sem detecções
+                    annotated_frame = await run_in_threadpool(detector.fit_display, frame)
+            
+            # Adicionar informações da câmera
+            cv2.putText(
+                annotated_frame,
+                f"Camera: {camera.name} | FPS: {camera.fps}",
+                (10, annotated_frame.shape[0] - 10),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (255, 255, 255),
+                1
+            )
+            
+            offer_latest_nowait(encode_q, annotated_frame)
+    finally:
+        # Parar as demais etapas do pipeline
+        stop_evt.set()
+
+
+def start_reader(camera_id: str, url: str, read_q: asyncio.Queue, loop: asyncio.AbstractEventLoop, stop_evt: threading.Event,
+                 released: threading.Event, previous: Optional[threading.Event]) -> Optional[threading.Thread]:
+    """
+    Executada no pool de threads: aguarda o pipeline anterior liberar a câmera,
+    abre o stream e inicia a thread de leitura, que passa a ser dona do VideoCapture.
+    
+    Se o pipeline for parado enquanto o stream abre, ele é liberado aqui mesmo
+    (a thread de leitura termina imediatamente e o libera).
+    
+    Returns:
+        Thread de leitura, ou None se o pipeline foi parado ou o stream não abriu
+    """
+    if previous is not None and not previous.wait(CAPTURE_RELEASE_TIMEOUT):
+        print(f"⚠️ Pipeline anterior da câmera {camera_id} não liberou o stream em {CAPTURE_RELEASE_TIMEOUT:.0f}s")
+    
+    if stop_evt.is_set():
+        released.set()
+        return None
+    
+    try:
+        cap = get_video_capture(camera_id, url)
+    except Exception as e:
+        print(f"Erro ao abrir stream: {e}")
+        released.set()
+        return None
+    
+    reader = threading.Thread(target=frame_reader, args=(camera_id, cap, read_q, loop, stop_evt, released), daemon=True)
+    reader.start()
+    return reader
+
+
+async def camera_pump(camera_id: str, stop_evt: threading.Event, released: threading.Event, previous: Optional[threading.Event]):
+    """
+    Pipeline de uma câmera, compartilhado por todos os clientes conectados.
+    
+    Três estágios ligados por filas pequenas que descartam o frame mais antigo
+    quando cheias: thread de leitura -> detecção (event loop) -> thread de
+    codificação JPEG, que distribui os frames para as filas dos clientes.
+    Assim N clientes custam uma única decodificação e detecção por frame.
+    
+    `previous` é o evento de liberação do pipeline anterior da câmera (ao
+    reativá-la ou trocar a URL); `released` é sinalizado quando este libera o stream.
+    """
+    camera = cameras_db.get(camera_id)
+    if camera is None:
+        released.set()
+        return
+    
+    loop = asyncio.get_running_loop()
+    read_q: asyncio.Queue = asyncio.Queue(maxsize=2)
+    encode_q: queue.Queue = queue.Queue(maxsize=2)
+    
+    try:
+        # A partir daqui o stream é liberado por start_reader ou pela thread de leitura
+        reader = await run_in_threadpool(start_reader, camera_id, camera.url, read_q, loop, stop_evt, released, previous)
+        if reader is None:
+            return
+        
+        writer = threading.Thread(target=frame_writer, args=(camera_id, encode_q, loop, stop_evt), daemon=True)
+        writer.start()
+        
+        await detect_frames(camera_id, read_q, encode_q, stop_evt)
+    finally:
+        # O VideoCapture é liberado (e removido de active_streams) pela thread de leitura
+        stop_evt.set()
         
-        last_frame_time = current_time
+        # Pipeline terminou sozinho (stream não abriu, falha na reconexão...):
+        # encerrar os streams dos clientes para que a interface mostre o erro.
+        # Paradas via stop_camera_pump já removeram a entrada e tratam os clientes lá
+        if camera_pumps.get(camera_id, (None,))[0] is asyncio.current_task():
+            del camera_pumps[camera_id]
+            broadcast(camera_id, None)
+
+
+def start_camera_pump(camera_id: str):
+    """
+    Inicia o pipeline da câmera, se ainda não estiver rodando. O novo pipeline
+    só abre o stream depois que o anterior (se houver) o liberar.
+    """
+    if camera_id in camera_pumps:
+        task, stop_evt = camera_pumps[camera_id]
+        if not task.done() and not stop_evt.is_set():
+            return
+    
+    stop_evt = threading.Event()
+    released = threading.Event()
+    previous = capture_released.get(camera_id)
+    capture_released[camera_id] = released
+    
+    task = asyncio.create_task(camera_pump(camera_id, stop_evt, released, previous))
+    camera_pumps[camera_id] = (task, stop_evt)
+
+
+def stop_camera_pump(camera_id: str, end_streams: bool = True):
+    """
+    Para o pipeline da câmera. As etapas terminam ao ver `stop_evt` (sem
+    cancelar a task, para que o stream ainda sendo aberto seja liberado) e o
+    VideoCapture é liberado pela thread de leitura.
+    
+    Args:
+        camera_id: ID da câmera
+        end_streams: Encerrar os streams dos clientes conectados; False ao
+            desativar ou reiniciar o pipeline (troca de URL), quando os
+            clientes continuam aguardando os frames do novo pipeline
+    """
+    if camera_id in camera_pumps:
+        _, stop_evt = camera_pumps.pop(camera_id)
+        stop_evt.set()
+    
+    active_streams.pop(camera_id, None)
+    
+    if end_streams:
+        broadcast(camera_id, None)
+
+
+async def generate_frames(camera_id: str) -> AsyncGenerator[bytes, None]:
+    """Gera frames processados com detecção de EPIs a partir do pipeline da câmera."""
+    client_q: asyncio.Queue = asyncio.Queue(maxsize=2)
+    camera_subscribers.setdefault(camera_id, set()).add(client_q)
+    
+    try:
+        # O pipeline pode ter falhado (e avisado os clientes) antes desta inscrição
+        camera = cameras_db.get(camera_id)
+        if camera is None or (camera.active and camera_id not in camera_pumps):
+            return
+        
+        while True:
+            chunk = await client_q.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # Cliente desconectou: remover sua fila
+        subscribers = camera_subscribers.get(camera_id)
+        if subscribers is not None:
+            subscribers.discard(client_q)
+            if not subscribers:
+                del camera_subscribers[camera_id]
 
 
 @router.get("/{camera_id}")
@@ -178,6 +570,10 @@ async def stream_camera(camera_id: str):
     if camera_id not in cameras_db:
         raise HTTPException(status_code=404, detail="Câmera não encontrada")
     
+    # Garantir que o pipeline esteja rodando (ex.: após um erro ou /stop)
+    if cameras_db[camera_id].active:
+        start_camera_pump(camera_id)
+    
     return StreamingResponse(
         generate_frames(camera_id),
         media_type="multipart/x-mixed-replace; boundary=frame"
@@ -187,11 +583,7 @@ async def stream_camera(camera_id: str):
 @router.post("/{camera_id}/stop")
 async def stop_stream(camera_id: str):
     """Para o stream de uma câmera."""
-    if camera_id in active_streams:
-        active_streams[camera_id].release()
-        del active_streams[camera_id]
-        if camera_id in stream_locks:
-            del stream_locks[camera_id]
+    stop_camera_pump(camera_id)
     return {"message": "Stream parado"}
 
 
@@ -219,14 +611,18 @@ async def get_camera_alerts(camera_id: str):
         alerts_data = camera_alerts.get(camera_id, {
             "timestamp": 0,
             "alerts": [],
-            "violations": [],
+            "detections": Detections.empty(),
             "has_violations": False,
             "person_count": 0,
             "epi_count": 0
         })
     
+    alerts_data = dict(alerts_data)
+    detections = alerts_data.pop("detections")
+    
     return {
         "camera_id": camera_id,
-        **alerts_data
+        **alerts_data,
+        "violations": EPIDetector.to_dicts(detections, violations_only=True)
     }
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, conint
 from typing import Optional
 
 
@@ -6,6 +6,8 @@ class CameraCreate(BaseModel):
     name: str
     url: str
     fps: int = 5
+    # Executar o detector a cada N frames (1 = todos; 0 = automático pela latência)
+    detect_every_n: int = Field(1, ge=0)
 
 
 class CameraResponse(BaseModel):
@@ -13,6 +15,7 @@ class CameraResponse(BaseModel):
     name: str
     url: str
     fps: int
+    detect_every_n: int = Field(1, ge=0)
     active: bool = True
 
 
@@ -20,5 +23,6 @@ class CameraUpdate(BaseModel):
     name: Optional[str] = None
     url: Optional[str] = None
     fps: Optional[int] = None
+    detect_every_n: Optional[conint(ge=0)] = None
     active: Optional[bool] = None
 